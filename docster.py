@@ -13,7 +13,9 @@ and exposes their contents through a clean web interface built with Flask and Pi
 
 📦 **Features**
 - Loads configuration from a `.docster` JSON file (auto-generated if not found).
-- Crawls the current working directory and recursively reads files (e.g., `.ts`, `.js`, `.md`, `.py`, `.svelte`, etc.).
+- Crawls the current working directory (or the `roots` listed in `.docster`) and recursively reads files
+  (e.g., `.ts`, `.js`, `.md`, `.py`, `.svelte`, etc.). For very large roots, set `crawl_processes` to crawl
+  top-level subtrees in parallel across a process pool; results are merged in sorted order.
 - Skips ignored folders, files, and file types based on regex patterns in config.
 - Formats content in Markdown-style blocks:
     ```ts
@@ -21,8 +23,21 @@ and exposes their contents through a clean web interface built with Flask and Pi
     function helloWorld() { ... }
     ```
 - Handles binary files gracefully by showing a placeholder.
-- Built-in function and variable extraction logic using regex and brace-matching (JavaScript/TypeScript style).
+- Built-in function and variable extraction logic using regex and brace-matching (JavaScript/TypeScript style),
+  `ast` outlines for Python files and `<script>`-block extraction for Svelte components.
 - Live web UI with search, copy, and config viewer features.
+- Import graph of TS/JS/Svelte files (with `$lib`-style aliases from `import_aliases`); `/context?path=&depth=`
+  returns a file plus everything it transitively imports.
+- `/pack?budget=N` returns only the files that fit a token budget, picked by recency, search hits or import
+  distance, using token estimates computed at crawl time.
+- Every crawl bumps a generation; `/changes?since=<gen>&epoch=<epoch>` returns only added/changed/removed
+  files (or a resync signal after a restart or once that generation has been compacted away).
+- `/search?mode=regex` (literal-prefiltered, run in a long-lived worker process that is killed at the time limit) and `mode=fuzzy` (edit distance over the crawled
+  identifier vocabulary), ranked and capped with `limit`.
+- Headless `dump` and `search` subcommands for scripts (no Flask import, no server).
+- `serve --workers N` runs N gunicorn processes that load one crawl snapshot from
+  `docster/index.sqlite3` (crawled once, not per worker), so CPU-heavy searches are no longer
+  serialized by the GIL. Each worker keeps its own in-memory copy of the files.
 
 🌐 **Web Interface**
 - Served locally on http://127.0.0.1:3222
@@ -38,13 +53,22 @@ and exposes their contents through a clean web interface built with Flask and Pi
    - Crawl your project for files.
    - Launch the web UI in your default browser.
 3. Use the interface to rerun crawls, view all content, or search for definitions.
+4. For scripts, skip the server entirely:
+   - `python docster.py dump > context.md` prints all formatted content.
+   - `python docster.py search useMyHook` prints the matching code blocks.
+
+⏱️ **Profiling**
+- `python docster.py --profile` runs every crawl and search under cProfile.
+- Or profile a single request with `?profile=1` on `/search` and `/rerun`.
+- Captures are stored as `.pstats` files in `docster/profiles/` (open them with `python -m pstats`
+  or snakeviz); `/profiles` lists them and `/profiles/<name>` returns a text report.
 
 🧠 **LLM Use Case**
 - Pipe the full output or individual extracted snippets into a prompt for your LLM-based assistant.
 - Enables intelligent contextual querying (e.g., "What does `useMyHook` do?" or "How is the `apiClient` constructed?").
 
 🔒 **Limitations**
-- Parsing is regex-based — not a full parser or AST, so false positives are possible.
+- Parsing is regex-based (except for Python definitions) — not a full parser or AST, so false positives are possible.
 - Works best with well-formatted JavaScript, TypeScript, Python, or Markdown projects.
 - Does not index deeply nested folders with ignored names or binary content.
 
@@ -57,10 +81,25 @@ import json
 import re
 import sys
 import time
-import webbrowser
 import threading
+import argparse
+import cProfile
+import pstats
+import io
+import contextlib
+import sqlite3
+import hashlib
+import uuid
+import posixpath
+import ast
+try:
+    import re._parser as sre_parse # Python 3.11+
+except ImportError:
+    import sre_parse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from flask import Flask, jsonify, request, render_template_string, send_from_directory
 
 # --- Constants ---
 DOCSTER_DIR_NAME = "docster"
@@ -69,9 +108,16 @@ DEFAULT_PORT = 3222
 CURRENT_WORKING_DIR = Path.cwd()
 DOCSTER_DIR_PATH = CURRENT_WORKING_DIR / DOCSTER_DIR_NAME
 CONFIG_FILE_PATH = CURRENT_WORKING_DIR / CONFIG_FILE_NAME
+PROFILES_DIR_PATH = DOCSTER_DIR_PATH / "profiles"
+INDEX_DB_PATH = DOCSTER_DIR_PATH / "index.sqlite3"
 
 # --- Default Configuration ---
 DEFAULT_CONFIG = {
+    "roots": ["."], # Directories to crawl, relative to the working directory
+    "crawl_processes": 1, # Worker processes for sharded crawls; 1 = crawl in-process, 0 = one per CPU
+    "import_aliases": {"$lib": "src/lib"}, # Import specifier prefixes and the crawled folder they map to
+    "change_history": 50, # Crawl deltas kept for /changes; older clients get a full-resync signal
+    "regex_timeout_seconds": 2.0, # Time budget for one mode=regex search; the worker is killed after it
     "ignored": {
         "folders": ["node_modules", ".git", ".vscode", "__pycache__", "dist", "build", DOCSTER_DIR_NAME],
         "files": [r"\.env.*", r"package-lock\.json", r"yarn\.lock"],
@@ -83,8 +129,12 @@ DEFAULT_CONFIG = {
 }
 
 # --- Global State ---
-crawled_data_store = {"files": [], "timestamp": None}
+crawled_data_store = {"files": [], "timestamp": None, "generation": 0, "epoch": uuid.uuid4().hex} # epoch: id of this run's generation history
 config_store = {}
+profiling_enabled = False # Set by --profile; profiles every crawl and search
+profiler_lock = threading.Lock() # Held while a cProfile capture runs; only one can be active per process
+shared_index_enabled = False # Set by `serve --workers N`; workers read crawls from INDEX_DB_PATH
+crawl_lock = threading.RLock() # Serialises generation bumps, snapshot publishing and reloads
 
 # --- HTML Template (using PicoCSS) ---
 INDEX_HTML = """
@@ -389,6 +439,14 @@ def compile_regex_list(patterns):
             print(f"[!] Invalid regex pattern '{pattern}' ignored: {e}", file=sys.stderr)
     return compiled
 
+def content_hash(content):
+    """Short stable hash of file content, used to key per-file caches."""
+    return hashlib.sha1(content.encode("utf-8", errors="replace")).hexdigest()
+
+def estimate_tokens(text):
+    """Rough LLM token estimate (~4 characters per token), cheap enough to compute at crawl time."""
+    return (len(text) + 3) // 4
+
 def is_ignored(path_str, ignore_patterns):
     """Checks if a path string matches any of the compiled regex patterns."""
     for pattern in ignore_patterns:
@@ -396,17 +454,19 @@ def is_ignored(path_str, ignore_patterns):
             return True
     return False
 
-def perform_crawl(root_dir=CURRENT_WORKING_DIR):
-    """Crawls the directory, reads files based on config, and updates global store."""
-    global crawled_data_store, config_store
-    print(f"[*] Starting crawl from: {root_dir}")
-    config = config_store # Use the globally loaded config
+# Field order of the compact per-file records that crawl workers send back to the parent.
+CRAWL_RECORD_FIELDS = ("path", "type", "content", "error", "hash", "tokens", "mtime")
 
+def build_crawl_rules(config, root_dir):
+    """Compiles the ignore/crawl patterns for one root. The result is picklable so it can be sent to workers."""
     ignored_folders_patterns = compile_regex_list(config.get("ignored", {}).get("folders", []))
-    ignored_files_patterns = compile_regex_list(config.get("ignored", {}).get("files", []))
-    ignored_file_types_patterns = compile_regex_list(config.get("ignored", {}).get("fileTypes", []))
-    crawl_file_types_patterns = compile_regex_list(config.get("crawl_file_types", []))
-    binary_file_types_patterns = compile_regex_list(config.get("binary_file_types", []))
+    rules = {
+        "ignored_folders": ignored_folders_patterns,
+        "ignored_files": compile_regex_list(config.get("ignored", {}).get("files", [])),
+        "ignored_file_types": compile_regex_list(config.get("ignored", {}).get("fileTypes", [])),
+        "crawl_file_types": compile_regex_list(config.get("crawl_file_types", [])),
+        "binary_file_types": compile_regex_list(config.get("binary_file_types", [])),
+    }
 
     # Add docster dir to ignored folders patterns dynamically if not already present via regex
     docster_dir_name_escaped = re.escape(DOCSTER_DIR_NAME)
@@ -418,95 +478,668 @@ def perform_crawl(root_dir=CURRENT_WORKING_DIR):
              print(f"[!] Cannot automatically ignore {DOCSTER_DIR_PATH} as it's not relative to {root_dir}. Ensure it's ignored via .docster config.", file=sys.stderr)
          except re.error as e:
              print(f"[!] Error compiling regex for {DOCSTER_DIR_NAME} ignore rule: {e}", file=sys.stderr)
+    return rules
 
+def is_ignored_folder(relative_dir_path, dirname, rules):
+    """Checks a folder against the ignored folder patterns, by relative path and by name."""
+    return is_ignored(str(relative_dir_path / dirname), rules["ignored_folders"]) or \
+           is_ignored(dirname, rules["ignored_folders"]) # Check folder name itself too
 
-    results = []
-    file_count = 0
+def read_crawl_record(root_dir, file_path, path_prefix, rules):
+    """
+    Applies the file rules to one file and reads it.
+
+    Returns a compact record (see CRAWL_RECORD_FIELDS), or None if the file is ignored.
+    """
+    relative_file_path_str = str(file_path.relative_to(root_dir))
+    filename = file_path.name
+    file_ext = file_path.suffix.lower()
+
+    # Check ignore rules
+    if is_ignored(relative_file_path_str, rules["ignored_files"]) or \
+       is_ignored(filename, rules["ignored_files"]) or \
+       is_ignored(file_ext, rules["ignored_file_types"]):
+        return None
+
+    # Check if it's a binary type we defined
+    is_binary = is_ignored(file_ext, rules["binary_file_types"]) or is_ignored(relative_file_path_str, rules["binary_file_types"])
+
+    # Check if it's a type we want to crawl *unless* it's binary
+    should_crawl = any(pattern.search(relative_file_path_str) for pattern in rules["crawl_file_types"])
+
+    content = None
+    read_error = False
+
+    if is_binary:
+         content = f"-- {file_ext[1:] if file_ext else 'binary'} file format, cannot be read as text --"
+    elif should_crawl:
+        try:
+            with open(file_path, "r", encoding="utf-8", errors='strict') as f:
+                content = f.read()
+        except UnicodeDecodeError:
+            content = "-- File possibly binary or non-utf8 encoding, cannot be read as text --"
+            read_error = True
+        except IOError as e:
+            content = f"-- Error reading file: {e} --"
+            read_error = True
+        except Exception as e:
+            content = f"-- Unexpected error reading file: {e} --"
+            read_error = True
+    else:
+         # Don't include files we don't explicitly want to crawl
+         return None
+
+    try:
+        mtime = file_path.stat().st_mtime
+    except OSError:
+        mtime = 0
+
+    return (
+        path_prefix + relative_file_path_str.replace("\\", "/"), # Normalize path separators
+        f"{file_ext[1:]}\n\n" if file_ext else "unknown\n",
+        content,
+        read_error,
+        content_hash(content),
+        estimate_tokens(content),
+        mtime,
+    )
+
+def crawl_shard(root_dir, shard_dir, path_prefix, rules):
+    """
+    Walks one top-level subtree of root_dir and reads its files.
+
+    Runs in a worker process during sharded crawls. Directory entries are visited in
+    sorted order so the merged result does not depend on filesystem order.
+    Returns (records, ignored_folder_count, ignored_file_count).
+    """
+    records = []
     ignored_folder_count = 0
     ignored_file_count = 0
 
-    for current_path_str, dirnames, filenames in os.walk(root_dir, topdown=True):
+    for current_path_str, dirnames, filenames in os.walk(shard_dir, topdown=True):
         current_path = Path(current_path_str)
         relative_dir_path = current_path.relative_to(root_dir)
 
         # Filter directories *before* os.walk descends into them
         original_dir_count = len(dirnames)
-        dirnames[:] = [
-            d for d in dirnames
-            if not is_ignored(str(relative_dir_path / d), ignored_folders_patterns) and
-               not is_ignored(d, ignored_folders_patterns) # Check folder name itself too
-        ]
+        dirnames[:] = sorted(d for d in dirnames if not is_ignored_folder(relative_dir_path, d, rules))
         ignored_folder_count += original_dir_count - len(dirnames)
 
-        for filename in filenames:
-            file_path = current_path / filename
-            relative_file_path_str = str(file_path.relative_to(root_dir))
-            file_ext = file_path.suffix.lower()
-
-            # Check ignore rules
-            if is_ignored(relative_file_path_str, ignored_files_patterns) or \
-               is_ignored(filename, ignored_files_patterns) or \
-               is_ignored(file_ext, ignored_file_types_patterns):
+        for filename in sorted(filenames):
+            record = read_crawl_record(root_dir, current_path / filename, path_prefix, rules)
+            if record is None:
                 ignored_file_count += 1
-                # print(f"Ignoring file: {relative_file_path_str}")
                 continue
+            records.append(record)
+
+    return records, ignored_folder_count, ignored_file_count
+
+def resolve_crawl_roots(config):
+    """Resolves the configured roots against the working directory, dropping missing and nested ones."""
+    candidates = []
+    for root in config.get("roots") or ["."]:
+        root_path = (CURRENT_WORKING_DIR / root).resolve()
+        if not root_path.is_dir():
+            print(f"[!] Crawl root {root_path} is not a directory. Skipping.", file=sys.stderr)
+            continue
+        if root_path not in candidates:
+            candidates.append(root_path)
+
+    # A root inside another root would crawl the same files twice under the same paths
+    roots = []
+    for root_path in candidates:
+        outer = next((other for other in candidates if other != root_path and other in root_path.parents), None)
+        if outer is not None:
+            print(f"[!] Crawl root {root_path} is inside {outer} and is already crawled. Skipping.", file=sys.stderr)
+            continue
+        roots.append(root_path)
+    return roots
+
+def crawl_path_prefix(root_dir):
+    """Prefix for paths under root_dir: relative to the working directory if possible, else absolute."""
+    try:
+        relative_root = root_dir.resolve().relative_to(CURRENT_WORKING_DIR.resolve())
+    except ValueError:
+        return root_dir.resolve().as_posix().rstrip("/") + "/"
+    return "" if relative_root == Path(".") else relative_root.as_posix() + "/"
 
-            # Check if it's a binary type we defined
-            is_binary = is_ignored(file_ext, binary_file_types_patterns) or is_ignored(relative_file_path_str, binary_file_types_patterns)
-
-            # Check if it's a type we want to crawl *unless* it's binary
-            should_crawl = any(pattern.search(relative_file_path_str) for pattern in crawl_file_types_patterns)
-
-            content = None
-            read_error = False
-
-            if is_binary:
-                 content = f"-- {file_ext[1:] if file_ext else 'binary'} file format, cannot be read as text --"
-            elif should_crawl:
-                try:
-                    with open(file_path, "r", encoding="utf-8", errors='strict') as f:
-                        content = f.read()
-                except UnicodeDecodeError:
-                    content = "-- File possibly binary or non-utf8 encoding, cannot be read as text --"
-                    read_error = True
-                except IOError as e:
-                    content = f"-- Error reading file: {e} --"
-                    read_error = True
-                except Exception as e:
-                    content = f"-- Unexpected error reading file: {e} --"
-                    read_error = True
-            else:
-                 # Don't include files we don't explicitly want to crawl
-                 ignored_file_count += 1
-                 continue
+def crawl_process_count(config):
+    """
+    Number of crawl worker processes; 1 (the default) crawls in-process and 0 means one per CPU.
 
+    Starting a pool costs more than it saves on small and medium projects, so sharding across
+    processes is opt-in for very large roots.
+    """
+    try:
+        processes = int(config.get("crawl_processes", 1))
+    except (TypeError, ValueError):
+        processes = 1
+    return processes if processes > 0 else (os.cpu_count() or 1)
 
-            file_info = {
-                "path": relative_file_path_str.replace("\\", "/"), # Normalize path separators
-                "type": f"{file_ext[1:]}\n\n" if file_ext else "unknown\n",
-                "content": content,
-                "error": read_error
-            }
-            results.append(file_info)
-            file_count += 1
+def worker_mp_context():
+    """
+    Multiprocessing context for worker processes.
 
+    Forking is cheapest, but can deadlock a process that runs other threads (the servers), so
+    fork is only used while this is the only thread, as in the headless commands; otherwise
+    forkserver, or spawn where that is unavailable.
+    """
+    start_methods = multiprocessing.get_all_start_methods()
+    if "fork" in start_methods and threading.active_count() == 1:
+        start_method = "fork"
+    else:
+        start_method = "forkserver" if "forkserver" in start_methods else "spawn"
+    return multiprocessing.get_context(start_method)
+
+def run_crawl_shards(shards, process_count):
+    """
+    Runs crawl_shard for each (root_dir, shard_dir, path_prefix, rules) shard.
 
-    crawled_data_store["files"] = results
-    crawled_data_store["timestamp"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    Uses a process pool when there is more than one shard and more than one process is
+    allowed; results come back in shard order either way. Falls back to crawling in this
+    process if the pool cannot be used, and crawls in-process while a profile capture is
+    running so the capture includes the crawl work.
+
+    Workers are started with worker_mp_context(), never by forking the server process.
+    """
+    if process_count > 1 and len(shards) > 1 and not profiler_lock.locked():
+        try:
+            with ProcessPoolExecutor(max_workers=min(process_count, len(shards)),
+                                     mp_context=worker_mp_context()) as executor:
+                return list(executor.map(crawl_shard, *zip(*shards)))
+        except (OSError, BrokenProcessPool) as e:
+            print(f"[!] Process pool crawl failed ({e}). Falling back to a single process.", file=sys.stderr)
+    return [crawl_shard(*shard) for shard in shards]
+
+def perform_crawl(root_dir=None):
+    """
+    Crawls the configured roots, reads files based on config, and updates global store.
+
+    Each root's top-level subtrees are crawled as separate shards, across a process pool if
+    `crawl_processes` allows it; top-level files are read here. Results are
+    merged in root order, then shard order, so output is deterministic.
+    """
+    global crawled_data_store, config_store
+    config = config_store # Use the globally loaded config
+    roots = [Path(root_dir)] if root_dir is not None else resolve_crawl_roots(config)
+
+    crawl_plan = [] # (top-level records, shards) per root
+    ignored_folder_count = 0
+    ignored_file_count = 0
+
+    for root in roots:
+        print(f"[*] Starting crawl from: {root}")
+        rules = build_crawl_rules(config, root)
+        path_prefix = crawl_path_prefix(root) if len(roots) > 1 else ""
+        try:
+            entries = sorted(os.scandir(root), key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"[!] Error listing crawl root {root}: {e}", file=sys.stderr)
+            continue
+
+        root_records = []
+        root_shards = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if is_ignored_folder(Path("."), entry.name, rules):
+                    ignored_folder_count += 1
+                else:
+                    root_shards.append((root, root / entry.name, path_prefix, rules))
+            elif entry.is_dir():
+                continue # Symlinked folder; os.walk does not descend into those either
+            else:
+                record = read_crawl_record(root, root / entry.name, path_prefix, rules)
+                if record is None:
+                    ignored_file_count += 1
+                else:
+                    root_records.append(record)
+        crawl_plan.append((root_records, root_shards))
+
+    all_shards = [shard for _, root_shards in crawl_plan for shard in root_shards]
+    shard_results = iter(run_crawl_shards(all_shards, crawl_process_count(config)))
+
+    # Merge: each root's top-level files first (as os.walk would yield them), then its subtrees
+    results = []
+    for root_records, root_shards in crawl_plan:
+        results.extend(dict(zip(CRAWL_RECORD_FIELDS, record)) for record in root_records)
+        for _ in root_shards:
+            shard_records, shard_ignored_folders, shard_ignored_files = next(shard_results)
+            ignored_folder_count += shard_ignored_folders
+            ignored_file_count += shard_ignored_files
+            results.extend(dict(zip(CRAWL_RECORD_FIELDS, record)) for record in shard_records)
+    file_count = len(results)
+
+    # Hold the crawl lock from reading the current generation to swapping in the new store, so
+    # concurrent crawls (e.g. two /rerun calls) get distinct generations and chained deltas.
+    with crawl_lock:
+        generation = crawled_data_store.get("generation", 0) + 1
+        changes = record_crawl_delta(crawled_data_store.get("files", []), results, generation,
+                                     config.get("change_history", 50), crawled_data_store.get("changes", []))
+        prune_outline_cache(results)
+        # Build the new store and swap it in with one assignment, so concurrent requests see either
+        # the old crawl or the new one, never a mix of both.
+        crawled_data_store = dict(
+            crawled_data_store,
+            files=results,
+            imports=build_import_graph(results, config.get("import_aliases") or {}),
+            identifiers=build_identifier_vocabulary(results),
+            changes=changes,
+            timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
+            generation=generation,
+        )
     print(f"[*] Crawl finished. Found {file_count} files.")
     print(f"[*] Ignored {ignored_folder_count} folders and {ignored_file_count} files based on config.")
     return True
 
 
+# --- Import Graph ---
+# Import/require specifiers are parsed from TS/JS/Svelte files at crawl time and resolved against
+# the crawled paths. Parsing results are cached by content hash, so a recrawl only re-parses files
+# that changed; resolving is a handful of set lookups per specifier.
+
+IMPORT_SOURCE_EXTENSIONS = (".ts", ".js", ".svelte", ".tsx", ".jsx", ".mjs", ".cjs", ".mts", ".cts")
+IMPORT_RESOLVE_EXTENSIONS = ("", ".ts", ".js", ".svelte", ".tsx", ".jsx", ".mjs", ".cjs", ".mts", ".cts", ".svelte.ts", ".svelte.js", ".d.ts")
+# TypeScript ESM imports name the emitted file (`./utils.js`) while the source is `./utils.ts`
+IMPORT_JS_TO_TS_EXTENSIONS = {".js": (".ts", ".tsx"), ".jsx": (".tsx",), ".mjs": (".mts",), ".cjs": (".cts",)}
+# Matches `... from 'x'`, `import 'x'`, `import('x')` and `require('x')`
+IMPORT_SPECIFIER_REGEX = re.compile(r"""(?:\bfrom\s*|\bimport\s*\(?\s*|\brequire\s*\(\s*)(['"])([^'"\n]+)\1""")
+
+import_specifier_cache = {} # content hash -> list of raw import specifiers
+
+def parse_import_specifiers(content):
+    """Returns the unique import specifiers in a file, in order of appearance."""
+    return list(dict.fromkeys(match.group(2) for match in IMPORT_SPECIFIER_REGEX.finditer(content)))
+
+def resolve_import(importer_path, specifier, known_paths, aliases):
+    """
+    Resolves an import specifier to a crawled path, or None for packages and unknown files.
+
+    Relative specifiers resolve against the importer's folder and aliased ones (e.g. `$lib`)
+    against their configured folder; extensions, `index` files and `.js` -> `.ts` source names are
+    tried like a bundler would.
+    """
+    if specifier.startswith("."):
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(importer_path), specifier))
+    else:
+        base = None
+        for alias, target in aliases.items():
+            if specifier == alias or specifier.startswith(alias + "/"):
+                base = posixpath.normpath(target.rstrip("/") + specifier[len(alias):])
+                break
+        if base is None:
+            return None # Bare package import
+
+    candidates = [base + ext for ext in IMPORT_RESOLVE_EXTENSIONS] + \
+                 [f"{base}/index{ext}" for ext in IMPORT_RESOLVE_EXTENSIONS if ext]
+    stem, js_ext = posixpath.splitext(base)
+    candidates += [stem + ts_ext for ts_ext in IMPORT_JS_TO_TS_EXTENSIONS.get(js_ext, ())]
+    for candidate in candidates:
+        if candidate in known_paths:
+            return candidate
+    return None
+
+def build_import_graph(files, aliases):
+    """Builds {path: [imported paths]} for the crawled source files, reusing cached parses."""
+    global import_specifier_cache
+    known_paths = {file_info["path"] for file_info in files}
+    graph = {}
+    live_cache = {}
+    for file_info in files:
+        path = file_info["path"]
+        if file_info.get("error") or not path.endswith(IMPORT_SOURCE_EXTENSIONS):
+            continue
+        file_hash = file_info.get("hash")
+        specifiers = import_specifier_cache.get(file_hash)
+        if specifiers is None:
+            specifiers = parse_import_specifiers(file_info.get("content") or "")
+        live_cache[file_hash] = specifiers
+
+        resolved = []
+        for specifier in specifiers:
+            target = resolve_import(path, specifier, known_paths, aliases)
+            if target and target != path and target not in resolved:
+                resolved.append(target)
+        graph[path] = resolved
+    import_specifier_cache = live_cache # Drop parses of content that no longer exists
+    return graph
+
+def collect_import_closure(path, graph, max_depth=None):
+    """
+    Returns [(path, depth)] for path and everything it transitively imports, breadth-first.
+
+    max_depth limits how many import hops are followed; None follows all of them.
+    """
+    closure = [(path, 0)]
+    seen = {path}
+    frontier = [path]
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = []
+        for current in frontier:
+            for target in graph.get(current, []):
+                if target not in seen:
+                    seen.add(target)
+                    closure.append((target, depth))
+                    next_frontier.append(target)
+        frontier = next_frontier
+    return closure
+
+
+# --- Change Feed ---
+# Every crawl bumps the generation and records which paths were added, changed or removed
+# (with content hashes). Only the last `change_history` deltas are kept; a client asking for
+# changes since a compacted generation is told to resync from /get_all instead. Generations are
+# only meaningful within one epoch (a random id per Docster run, shared by all workers), so
+# clients send the epoch back and get a resync when the server was restarted.
+
+def record_crawl_delta(old_files, new_files, generation, history_limit, changes):
+    """Returns changes plus the delta between two crawls, with old entries compacted away. changes is not modified."""
+    old_hashes = {f["path"]: f.get("hash") for f in old_files}
+    new_hashes = {f["path"]: f.get("hash") for f in new_files}
+    delta = {
+        "generation": generation,
+        "added": {p: h for p, h in new_hashes.items() if p not in old_hashes},
+        "changed": {p: h for p, h in new_hashes.items() if p in old_hashes and old_hashes[p] != h},
+        "removed": [p for p in old_hashes if p not in new_hashes],
+    }
+    try:
+        history_limit = max(1, int(history_limit))
+    except (TypeError, ValueError):
+        history_limit = 50
+    return (list(changes) + [delta])[-history_limit:]
+
+def collect_changes_since(since, epoch, store=None):
+    """
+    Merges the recorded deltas after generation `since` into one net delta.
+
+    Returns {"added": {path: hash}, "changed": {path: hash}, "removed": [paths]}, or None
+    if the client has to resync: `epoch` is not the current one, or `since` is older than
+    the retained history (or newer than the current generation).
+    """
+    store = store if store is not None else crawled_data_store
+    changes = store.get("changes", [])
+    current = store.get("generation", 0)
+    oldest_answerable = changes[0]["generation"] - 1 if changes else current
+    if epoch != store.get("epoch") or since < oldest_answerable or since > current:
+        return None
+
+    net = {} # path -> ("added" | "changed" | "removed", hash)
+    for delta in changes:
+        if delta["generation"] <= since:
+            continue
+        for path, file_hash in delta["added"].items():
+            previous = net.get(path, (None,))[0]
+            net[path] = ("changed" if previous == "removed" else "added", file_hash)
+        for path, file_hash in delta["changed"].items():
+            previous = net.get(path, (None,))[0]
+            net[path] = ("added" if previous == "added" else "changed", file_hash)
+        for path in delta["removed"]:
+            if net.get(path, (None,))[0] == "added":
+                del net[path] # Appeared and disappeared within the window
+            else:
+                net[path] = ("removed", None)
+
+    return {
+        "added": {p: h for p, (state, h) in net.items() if state == "added"},
+        "changed": {p: h for p, (state, h) in net.items() if state == "changed"},
+        "removed": [p for p, (state, _) in net.items() if state == "removed"],
+    }
+
+
+# --- Shared Index (multi-process serving) ---
+# With `serve --workers N` every worker process loads the same crawl snapshot from a SQLite
+# database in the docster/ directory instead of crawling on its own. Whichever process crawls
+# (the master at startup, or a worker handling /rerun) publishes the snapshot; SQLite's write
+# lock guarantees a single writer, and WAL mode lets readers keep serving while it writes.
+# A background thread in each worker polls the snapshot generation and reloads only when it moved.
+# Each worker still holds its own in-memory copy of the files; what is shared is the crawl
+# work and a consistent snapshot, not memory.
+
+FILE_COLUMNS = ("path", "type", "content", "error")
+INDEX_POLL_SECONDS = 1.0
+
+def open_index_db():
+    """Opens the shared index database, creating its tables if needed."""
+    conn = sqlite3.connect(str(INDEX_DB_PATH), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA mmap_size=268435456") # Read the database through mmap rather than read() calls
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS files ("
+        "seq INTEGER PRIMARY KEY, path TEXT, type TEXT, content TEXT, error INTEGER, extra TEXT)"
+    )
+    return conn
+
+def read_index_generation(conn):
+    """Returns the generation of the published snapshot, or 0 if none was published."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+    return int(row[0]) if row else 0
+
+def publish_snapshot():
+    """
+    Writes the in-memory crawl to the shared index as a new generation.
+
+    Per-file keys beyond FILE_COLUMNS are stored as JSON in the `extra` column and
+    store-level keys (everything except "files") in the `store` meta row, so new
+    crawl metadata does not need schema changes.
+    """
+    global crawled_data_store
+    store = dict(crawled_data_store)
+    conn = open_index_db()
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE") # Take the write lock before reading the generation
+            # Never reuse a generation: continue after both the index and this process
+            generation = max(read_index_generation(conn) + 1, store.get("generation", 0))
+            changes = list(store.get("changes", []))
+            if changes and changes[-1]["generation"] == store.get("generation"):
+                # The delta was recorded against the local generation; label it with the published one
+                changes[-1] = dict(changes[-1], generation=generation)
+            store["changes"] = changes
+            store["generation"] = generation
+            conn.execute("DELETE FROM files")
+            conn.executemany(
+                "INSERT INTO files (seq, path, type, content, error, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (seq, f["path"], f["type"], f["content"], int(bool(f["error"])),
+                     json.dumps({k: v for k, v in f.items() if k not in FILE_COLUMNS}))
+                    for seq, f in enumerate(store["files"])
+                ),
+            )
+            store_meta = {k: v for k, v in store.items() if k != "files"}
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("generation", str(generation)), ("store", json.dumps(store_meta))],
+            )
+    finally:
+        conn.close()
+    crawled_data_store = store
+    print(f"[*] Published crawl snapshot generation {generation} to {INDEX_DB_PATH}")
+    return generation
+
+def sync_from_index(conn):
+    """
+    Reloads crawled_data_store from the shared index if a newer generation was published.
+
+    The new store is built separately and swapped in with one assignment, so other threads
+    keep reading the previous snapshot until it is complete.
+    """
+    global crawled_data_store
+    generation = read_index_generation(conn)
+    if generation == crawled_data_store.get("generation"):
+        return False
+    conn.execute("BEGIN") # One read transaction so files and meta come from the same generation
+    try:
+        generation = read_index_generation(conn)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'store'").fetchone()
+        files = []
+        for path, file_type, content, error, extra in conn.execute(
+            "SELECT path, type, content, error, extra FROM files ORDER BY seq"
+        ):
+            file_info = {"path": path, "type": file_type, "content": content, "error": bool(error)}
+            if extra:
+                file_info.update(json.loads(extra))
+            files.append(file_info)
+    finally:
+        conn.rollback() # End the read transaction
+    store = json.loads(row[0]) if row else {}
+    store["files"] = files
+    store["generation"] = generation
+    prune_outline_cache(files)
+    crawled_data_store = store
+    print(f"[*] Worker {os.getpid()} loaded crawl snapshot generation {generation}")
+    return True
+
+def watch_shared_index():
+    """
+    Keeps this worker's store in sync with the shared index, off the request path.
+
+    Runs in a daemon thread in each worker with one long-lived connection; requests never
+    touch SQLite, and a snapshot published by another process is picked up within
+    INDEX_POLL_SECONDS.
+    """
+    conn = open_index_db()
+    while True:
+        try:
+            with crawl_lock: # Never swap in a snapshot in the middle of a local crawl
+                sync_from_index(conn)
+        except sqlite3.Error as e:
+            print(f"[!] Error reading shared index {INDEX_DB_PATH}: {e}", file=sys.stderr)
+        time.sleep(INDEX_POLL_SECONDS)
+
+def start_index_watcher():
+    """Starts watch_shared_index in a daemon thread (called in each worker after fork)."""
+    threading.Thread(target=watch_shared_index, name="docster-index-watcher", daemon=True).start()
+
+
+# --- Profiling ---
+
+def run_profiled(label, func, *args, **kwargs):
+    """
+    Runs func under cProfile and writes the stats to docster/profiles/.
+
+    Returns a tuple of (result, profile_file_name). The file name is None if the
+    stats could not be written, or if another capture was already running (only one
+    profiler can be active per process on Python 3.12+), in which case func runs
+    unprofiled. The result of func is returned either way.
+    """
+    if not profiler_lock.acquire(blocking=False):
+        print(f"[!] Another profile capture is running; '{label}' runs unprofiled.", file=sys.stderr)
+        return func(*args, **kwargs), None
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.disable()
+    finally:
+        profiler_lock.release()
+
+    safe_label = re.sub(r"[^\w\-]+", "_", label)[:40] or "run"
+    file_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{safe_label}.pstats"
+    try:
+        PROFILES_DIR_PATH.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(PROFILES_DIR_PATH / file_name))
+        print(f"[*] Profile written to {PROFILES_DIR_PATH / file_name}")
+    except OSError as e:
+        print(f"[!] Error writing profile {file_name}: {e}", file=sys.stderr)
+        file_name = None
+    return result, file_name
+
+def maybe_profiled(label, force, func, *args, **kwargs):
+    """Runs func profiled if --profile is active or force is set, otherwise runs it directly."""
+    if profiling_enabled or force:
+        return run_profiled(label, func, *args, **kwargs)
+    return func(*args, **kwargs), None
+
+def list_profiles():
+    """Lists captured profiles, newest first."""
+    if not PROFILES_DIR_PATH.exists():
+        return []
+    profiles = []
+    for entry in PROFILES_DIR_PATH.glob("*.pstats"):
+        stat = entry.stat()
+        profiles.append({
+            "name": entry.name,
+            "size": stat.st_size,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stat.st_mtime)),
+        })
+    profiles.sort(key=lambda p: p["name"], reverse=True)
+    return profiles
+
+def render_profile(name, sort_key="cumulative", limit=40):
+    """Renders a stored profile as a pstats text report. Returns None if it does not exist."""
+    profile_path = PROFILES_DIR_PATH / Path(name).name # Never leave the profiles directory
+    if profile_path.suffix != ".pstats" or not profile_path.is_file():
+        return None
+    stream = io.StringIO()
+    stats = pstats.Stats(str(profile_path), stream=stream)
+    stats.sort_stats(sort_key).print_stats(limit)
+    return stream.getvalue()
+
+
 def format_all_content(data):
     """Formats the crawled data into the specified markdown-like string."""
     output = []
     for file_info in data.get("files", []):
-        output.append(f"// {file_info['path']}\n```{file_info['type']}")
+        header, separator = format_file_header(file_info)
+        output.append(header)
         output.append(file_info['content'])
-        output.append("```\n\n") # Add separator
+        output.append(separator) # Add separator
     return "".join(output)
 
+# --- Context Packing ---
+PACK_PRIORITIES = ("recent", "search", "deps")
+
+def format_file_header(file_info):
+    """Header and separator format_all_content wraps around each file's content."""
+    return f"// {file_info['path']}\n```{file_info['type']}", "```\n\n"
+
+def pack_content(budget, priority="recent", keyword=None, path=None):
+    """
+    Picks files in priority order until the token budget is used up.
+
+    priority is one of:
+      - "recent": newest files first (crawl-time mtime),
+      - "search": files containing keyword, most occurrences first,
+      - "deps": path and its imports, nearest first.
+    Files that do not fit are skipped so smaller ones further down can still be packed.
+    Returns (packed files, used tokens, skipped count). Raises ValueError on bad arguments.
+    """
+    files = [f for f in crawled_data_store.get("files", []) if not f.get("error")]
+    if priority == "recent":
+        candidates = sorted(files, key=lambda f: f.get("mtime", 0), reverse=True)
+    elif priority == "search":
+        if not keyword:
+            raise ValueError("priority=search requires a keyword")
+        hits = [(f["content"].count(keyword), f) for f in files if keyword in f["content"]]
+        candidates = [f for _, f in sorted(hits, key=lambda hit: hit[0], reverse=True)]
+    elif priority == "deps":
+        if not path:
+            raise ValueError("priority=deps requires a path")
+        files_by_path = {f["path"]: f for f in files}
+        if path not in files_by_path:
+            raise ValueError(f"Path '{path}' was not crawled")
+        closure = collect_import_closure(path, crawled_data_store.get("imports", {}))
+        candidates = [files_by_path[p] for p, _ in closure if p in files_by_path]
+    else:
+        raise ValueError(f"Unknown priority '{priority}'. Use one of: {', '.join(PACK_PRIORITIES)}")
+
+    packed = []
+    used = 0
+    skipped = 0
+    for file_info in candidates:
+        header, separator = format_file_header(file_info)
+        cost = file_info.get("tokens", estimate_tokens(file_info["content"])) + estimate_tokens(header + separator)
+        if used + cost > budget:
+            skipped += 1
+            continue
+        packed.append(file_info)
+        used += cost
+    return packed, used, skipped
+
 # --- Function/Variable Extraction Logic (Regex based - Basic) ---
 # Regex patterns (can be refined)
 # Simple function: function name(...) { ... }
@@ -650,8 +1283,127 @@ def extract_code_block(content, keyword):
     # No matching block found
     return None
 
-def search_content(keyword):
-    """Searches for keyword in crawled data, attempting code block extraction."""
+# --- Language-Aware Extraction ---
+# Python files are outlined with `ast` and Svelte files by the offsets of their <script> blocks,
+# which are then searched with the JS-style extractor above. Outlines are cached by content
+# hash, so repeated searches do not re-parse files that have not changed.
+
+SVELTE_SCRIPT_REGEX = re.compile(r"<script\b[^>]*>(.*?)</script>", re.DOTALL | re.IGNORECASE)
+
+outline_cache = {} # content hash -> outline (see python_outline / svelte_outline)
+
+def python_outline(content):
+    """
+    Maps definition names to (first line, last line) spans, 1-based and inclusive.
+
+    Functions and classes are recorded under their own name and their dotted qualified name
+    (e.g. `Crawler.run`), starting at their first decorator; module-level assignments under
+    the assigned name. The first definition of a name wins. Returns None if the file does not parse.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError, MemoryError, RecursionError): # Deeply nested input exhausts the parser
+        return None
+
+    outline = {}
+    def visit(body, prefix):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                span = (start, node.end_lineno)
+                outline.setdefault(node.name, span)
+                if prefix:
+                    outline.setdefault(f"{prefix}.{node.name}", span)
+                visit(node.body, f"{prefix}.{node.name}" if prefix else node.name)
+            elif not prefix and isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        outline.setdefault(target.id, (node.lineno, node.end_lineno))
+    visit(tree.body, "")
+    return outline
+
+def svelte_outline(content):
+    """Returns the (start, end) character offsets of the contents of each <script> block."""
+    return [match.span(1) for match in SVELTE_SCRIPT_REGEX.finditer(content)]
+
+def get_outline(file_info, builder):
+    """Returns the cached outline for a file's content, building it with builder on a miss."""
+    key = (builder.__name__, file_info.get("hash") or content_hash(file_info["content"]))
+    outline = outline_cache.get(key)
+    if outline is None and key not in outline_cache:
+        outline = builder(file_info["content"])
+        outline_cache[key] = outline
+    return outline
+
+def prune_outline_cache(files):
+    """Drops cached outlines for content that is no longer part of the crawl, swapping in a new dict."""
+    global outline_cache
+    live_hashes = {file_info.get("hash") for file_info in files}
+    outline_cache = {key: outline for key, outline in list(outline_cache.items()) if key[1] in live_hashes}
+
+KEYWORD_CONTEXT_LINES = 5 # Lines shown on each side of a keyword with no extractable declaration
+MAX_ENCLOSING_SPAN_LINES = 80 # Larger enclosing Python definitions fall back to a context window
+
+def keyword_context_window(content, keyword, radius=KEYWORD_CONTEXT_LINES):
+    """Returns the lines around the first occurrence of keyword, or None if it does not occur."""
+    index = content.find(keyword)
+    if index == -1:
+        return None
+    lines = content.split("\n")
+    line_number = content.count("\n", 0, index)
+    start = max(0, line_number - radius)
+    return "\n".join(lines[start:line_number + radius + 1])
+
+def extract_block_for_file(file_info, keyword):
+    """
+    Extracts the definition of keyword using the extractor for the file's language.
+
+    - `.py`: the span of the matching def/class/assignment from the cached `ast` outline; if
+      keyword is not defined, the smallest definition enclosing its first use (up to
+      MAX_ENCLOSING_SPAN_LINES), else a few lines around it.
+    - `.svelte`: JS-style extraction inside each <script> block; if there is no declaration
+      (e.g. the keyword is only used in markup), a few lines around its first use are returned
+      instead of the whole component.
+      Unparseable Python files use `extract_code_block`, then the context window.
+    - anything else: `extract_code_block`.
+    Returns None if nothing better than the whole file was found.
+    """
+    content = file_info.get("content") or ""
+    path = file_info.get("path", "")
+
+    if path.endswith(".py"):
+        outline = get_outline(file_info, python_outline)
+        if outline is not None:
+            # ast numbers lines by \n, \r\n and \r only; splitlines() also breaks on \f, \u2028, ...
+            normalized = content.replace("\r\n", "\n").replace("\r", "\n")
+            span = outline.get(keyword)
+            if span is None:
+                index = normalized.find(keyword)
+                if index == -1:
+                    return None
+                line_number = normalized.count("\n", 0, index) + 1
+                enclosing = [(end - start, start, end) for start, end in outline.values() if start <= line_number <= end]
+                if not enclosing or min(enclosing)[0] >= MAX_ENCLOSING_SPAN_LINES:
+                    return keyword_context_window(normalized, keyword)
+                span = min(enclosing)[1:]
+            lines = normalized.split("\n")
+            return "\n".join(lines[span[0] - 1:span[1]])
+        # Unparseable Python falls back to the regex extractor, then to a context window
+        return extract_code_block(content, keyword) or keyword_context_window(content, keyword)
+
+    elif path.endswith(".svelte"):
+        scripts = [content[start:end] for start, end in get_outline(file_info, svelte_outline)]
+        for script in scripts:
+            block = extract_code_block(script, keyword)
+            if block:
+                return block
+        return keyword_context_window(content, keyword)
+
+    return extract_code_block(content, keyword)
+
+def search_content(keyword, limit=None):
+    """Searches for keyword in crawled data, attempting code block extraction. Stops after limit matches if given."""
     results = []
     match_count = 0
     global crawled_data_store
@@ -661,6 +1413,8 @@ def search_content(keyword):
     # is_function_kw = re.compile(r"(?:function|=>)\s*" + re.escape(keyword)) # Simple check
 
     for file_info in files_data:
+        if limit is not None and match_count >= limit:
+            break
         content = file_info.get("content", "")
         path = file_info.get("path", "unknown")
         file_type = file_info.get("type", "unknown")
@@ -668,7 +1422,7 @@ def search_content(keyword):
         # Basic keyword search first
         if keyword in content:
             # Attempt to extract a relevant code block
-            extracted_block = extract_code_block(content, keyword)
+            extracted_block = extract_block_for_file(file_info, keyword)
 
             if extracted_block:
                  # Add comment indicating potential extraction
@@ -688,88 +1442,586 @@ def search_content(keyword):
     return formatted_output, match_count
 
 
-# --- Flask Application ---
-app = Flask(__name__, static_folder=DOCSTER_DIR_PATH.name, template_folder=DOCSTER_DIR_PATH.name)
-# Use a secret key for session management, flash messages, etc. (optional here)
-app.secret_key = os.urandom(24)
+# --- Regex and Fuzzy Search ---
+SEARCH_MODES = ("exact", "regex", "fuzzy")
+
+class SearchInputError(Exception):
+    """Raised for invalid search input (unknown mode, bad regex); reported to clients as a 400."""
+DEFAULT_SEARCH_LIMIT = 20
+MAX_LINES_PER_REGEX_HIT = 20
+IDENTIFIER_REGEX = re.compile(r"[A-Za-z_$][\w$]{2,}")
+
+identifier_cache = {} # content hash -> sorted identifiers in that content
+
+def build_identifier_vocabulary(files):
+    """Builds {identifier: [paths]} for the crawl, reusing per-content identifier sets."""
+    global identifier_cache
+    vocabulary = {}
+    live_cache = {}
+    for file_info in files:
+        if file_info.get("error"):
+            continue
+        file_hash = file_info.get("hash")
+        identifiers = identifier_cache.get(file_hash)
+        if identifiers is None:
+            identifiers = sorted(set(IDENTIFIER_REGEX.findall(file_info.get("content") or "")))
+        live_cache[file_hash] = identifiers
+        for identifier in identifiers:
+            vocabulary.setdefault(identifier, []).append(file_info["path"])
+    identifier_cache = live_cache
+    return vocabulary
+
+def required_literal(pattern):
+    """
+    Returns the longest literal run every match of pattern must contain, or "" if none is known.
 
-@app.route('/')
-def index():
-    """Serves the main HTML page. Tries to load from file, falls back to inlined template string if necessary."""
+    Only top-level literals of a case-sensitive pattern are considered, which is enough to skip
+    most files with a plain substring check before running the regex on them.
+    """
     try:
-        return send_from_directory(DOCSTER_DIR_PATH.name, 'index.html')
-    except Exception as e:
-        print(f"[!] Failed to serve index.html from disk: {e}. Falling back to in-memory template.", file=sys.stderr)
-        try:
-            return render_template_string(INDEX_HTML)
-        except Exception as render_err:
-            print(f"[!] Error rendering fallback template: {render_err}", file=sys.stderr)
-            return "<h3>Docster encountered a fatal UI error.</h3><p>Please check the console for details.</p>", 500
-
-@app.route('/rerun', methods=['POST'])
-def rerun_endpoint():
-    """Triggers a new crawl."""
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return ""
+    if parsed.state.flags & re.IGNORECASE:
+        return ""
+    best = ""
+    current = []
+    for op, value in parsed:
+        if op == sre_parse.LITERAL:
+            current.append(chr(value))
+            continue
+        if len(current) > len(best):
+            best = "".join(current)
+        current = []
+    if len(current) > len(best):
+        best = "".join(current)
+    return best
+
+REGEX_CHUNK_CHARS = 1_000_000 # Content the regex worker scans between progress messages
+
+# Regex searches run in one long-lived worker process that holds a copy of the corpus: `re`
+# cannot be interrupted mid-match and holds the GIL while it backtracks, so the only reliable
+# timeout is killing the process doing the matching. The corpus is sent once per crawl
+# generation, and the worker is only restarted after a timeout kill.
+regex_worker = {"process": None, "conn": None, "corpus_key": None}
+regex_worker_lock = threading.Lock() # One regex search at a time per process
+
+def compile_search_regex(pattern):
+    """Compiles a user pattern. Raises SearchInputError for invalid patterns."""
     try:
-        success = perform_crawl()
-        if success:
-            return jsonify({"message": f"Crawl complete. {len(crawled_data_store['files'])} files processed. Updated: {crawled_data_store['timestamp']}"}), 200
-        else:
-             return jsonify({"error": "Crawl process failed."}), 500
-    except Exception as e:
-        print(f"[!] Error during /rerun: {e}", file=sys.stderr)
-        return jsonify({"error": f"An internal error occurred during crawl: {e}"}), 500
+        return re.compile(pattern, re.MULTILINE)
+    except re.error as e:
+        raise SearchInputError(f"Invalid regex: {e}")
+
+def scan_regex_content(compiled, content):
+    """Returns (match count, matched line numbers) for one file."""
+    count = 0
+    line_numbers = []
+    for match in compiled.finditer(content):
+        count += 1
+        if len(line_numbers) < MAX_LINES_PER_REGEX_HIT:
+            line_number = content.count("\n", 0, match.start()) + 1
+            if line_number not in line_numbers:
+                line_numbers.append(line_number)
+    return count, line_numbers
+
+def regex_worker_main(conn):
+    """
+    Regex worker loop. Receives ("corpus", [content or None]) and ("search", pattern, literal);
+    answers a search with ("hits", [(index, count, line numbers)]) messages as it goes,
+    followed by ("done",).
+    """
+    contents = []
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message[0] == "corpus":
+            contents = message[1]
+            continue
+        _, pattern, literal = message
+        compiled = re.compile(pattern, re.MULTILINE)
+        hits = []
+        scanned = 0
+        for index, content in enumerate(contents):
+            if content is None or (literal and literal not in content):
+                continue
+            count, line_numbers = scan_regex_content(compiled, content)
+            if count:
+                hits.append((index, count, line_numbers))
+            scanned += len(content)
+            if scanned >= REGEX_CHUNK_CHARS:
+                conn.send(("hits", hits))
+                hits = []
+                scanned = 0
+        conn.send(("hits", hits))
+        conn.send(("done",))
+
+def stop_regex_worker():
+    """Kills the regex worker (after a timeout, or if it broke); the next search starts a new one."""
+    process, conn = regex_worker["process"], regex_worker["conn"]
+    regex_worker.update(process=None, conn=None, corpus_key=None)
+    if conn is not None:
+        conn.close()
+    if process is not None:
+        process.terminate()
+        process.join(1)
+
+def ensure_regex_worker(store):
+    """Starts the regex worker if needed and makes sure it holds the store's corpus. Returns its connection."""
+    if regex_worker["process"] is None or not regex_worker["process"].is_alive():
+        stop_regex_worker()
+        context = worker_mp_context()
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(target=regex_worker_main, args=(child_conn,), name="docster-regex", daemon=True)
+        process.start()
+        child_conn.close()
+        regex_worker.update(process=process, conn=parent_conn)
+    corpus_key = (store.get("epoch"), store.get("generation"))
+    if regex_worker["corpus_key"] != corpus_key:
+        regex_worker["conn"].send(("corpus", [
+            None if f.get("error") else (f.get("content") or "") for f in store.get("files", [])
+        ]))
+        regex_worker["corpus_key"] = corpus_key
+    return regex_worker["conn"]
+
+def search_regex(pattern, limit=DEFAULT_SEARCH_LIMIT, timeout=2.0):
+    """
+    Runs a regex over the crawl, ranked by matches per file.
 
+    Files that lack the pattern's required literal are skipped without running the regex. The
+    matching runs in the regex worker, which is killed at the deadline. Returns (formatted
+    output, match count, timed_out); on timeout the hits reported so far are returned.
+    """
+    compile_search_regex(pattern) # Reject invalid patterns before involving the worker
+    literal = required_literal(pattern)
+    store = crawled_data_store
+    files = store.get("files", [])
+
+    deadline = time.monotonic() + timeout
+    timed_out = False
+    hits = [] # (match count, file_info, matched line numbers)
+    with regex_worker_lock:
+        try:
+            conn = ensure_regex_worker(store)
+            conn.send(("search", pattern, literal))
+            while True:
+                if not conn.poll(max(0.0, deadline - time.monotonic())):
+                    timed_out = True
+                    stop_regex_worker()
+                    break
+                message = conn.recv()
+                if message[0] == "done":
+                    break
+                hits.extend((count, files[index], line_numbers) for index, count, line_numbers in message[1])
+        except (EOFError, OSError):
+            stop_regex_worker()
+            raise
+
+    hits.sort(key=lambda hit: hit[0], reverse=True)
+    results = []
+    for count, file_info, line_numbers in hits[:limit]:
+        lines = file_info["content"].split("\n") # Same line breaks the worker counted
+        results.append(f"// {file_info['path']} ({count} matches for /{pattern}/)\n```{file_info['type']}")
+        results.append("\n".join(f"{n}: {lines[n - 1].rstrip(chr(13))}" for n in line_numbers if n <= len(lines)))
+        results.append("\n```\n\n")
+    return "".join(results), min(len(hits), limit), timed_out
+
+def bounded_edit_distance(a, b, max_distance):
+    """Levenshtein distance between a and b, or max_distance + 1 as soon as it must exceed max_distance."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+def search_fuzzy(term, limit=DEFAULT_SEARCH_LIMIT, max_distance=None):
+    """
+    Ranks crawled identifiers by case-insensitive edit distance to term.
 
-@app.route('/get_all', methods=['GET'])
-def get_all_endpoint():
-    """Returns all crawled content."""
-    global crawled_data_store
-    formatted_content = format_all_content(crawled_data_store)
-    return jsonify({
-        "content": formatted_content,
-        "file_count": len(crawled_data_store.get("files", [])),
-        "timestamp": crawled_data_store.get("timestamp", "N/A")
-    })
-
-@app.route('/search', methods=['GET'])
-def search_endpoint():
-    """Searches the crawled content for a keyword."""
-    keyword = request.args.get('keyword', '')
-    if not keyword:
-        return jsonify({"error": "Missing search keyword"}), 400
+    Uses the identifier vocabulary built at crawl time, so no file content is scanned to find
+    candidates. Each hit lists up to limit files it appears in, plus the definition blocks that
+    could be extracted (at most limit blocks overall). Returns (formatted output, match count).
+    """
+    if max_distance is None:
+        max_distance = 1 if len(term) <= 4 else 2
+    needle = term.lower()
+    vocabulary = crawled_data_store.get("identifiers", {})
+    ranked = []
+    for identifier, paths in vocabulary.items():
+        distance = bounded_edit_distance(needle, identifier.lower(), max_distance)
+        if distance <= max_distance:
+            ranked.append((distance, -len(paths), identifier))
+    ranked.sort()
+
+    files_by_path = {f["path"]: f for f in crawled_data_store.get("files", [])}
+    results = []
+    block_count = 0 # Blocks count toward limit too, so common identifiers cannot flood the output
+    for distance, _, identifier in ranked[:limit]:
+        paths = vocabulary[identifier]
+        listed = ", ".join(paths[:limit]) + (f" (+{len(paths) - limit} more)" if len(paths) > limit else "")
+        results.append(f"// '{identifier}' (distance {distance}) found in: {listed}\n")
+        for path in paths[:limit]:
+            if block_count >= limit:
+                break
+            file_info = files_by_path.get(path)
+            block = extract_block_for_file(file_info, identifier) if file_info else None
+            if block:
+                results.append(f"// {path} (Code block for '{identifier}')\n```{file_info['type']}")
+                results.append(block.strip())
+                results.append("\n```\n")
+                block_count += 1
+        results.append("\n")
+    return "".join(results), min(len(ranked), limit)
+
+def run_search(keyword, mode="exact", limit=None):
+    """
+    Runs a search in the given mode. Returns (formatted output, match count, timed_out).
+    Raises SearchInputError for unknown modes or invalid regex patterns.
+    """
+    if mode == "exact":
+        output, match_count = search_content(keyword, limit)
+        return output, match_count, False
+    if mode == "regex":
+        return search_regex(keyword, limit or DEFAULT_SEARCH_LIMIT,
+                            float(config_store.get("regex_timeout_seconds", 2.0)))
+    if mode == "fuzzy":
+        output, match_count = search_fuzzy(keyword, limit or DEFAULT_SEARCH_LIMIT)
+        return output, match_count, False
+    raise SearchInputError(f"Unknown search mode '{mode}'. Use one of: {', '.join(SEARCH_MODES)}")
 
-    try:
-        search_results, match_count = search_content(keyword)
+
+# --- Flask Application ---
+def create_app():
+    """
+    Builds the Flask app and registers its routes.
+
+    Flask is imported here rather than at module level so the headless `dump` and
+    `search` subcommands never pay for it.
+    """
+    from flask import Flask, jsonify, request, render_template_string, send_from_directory
+
+    app = Flask(__name__, static_folder=DOCSTER_DIR_PATH.name, template_folder=DOCSTER_DIR_PATH.name)
+    # Use a secret key for session management, flash messages, etc. (optional here)
+    app.secret_key = os.urandom(24)
+
+    @app.route('/')
+    def index():
+        """Serves the main HTML page. Tries to load from file, falls back to inlined template string if necessary."""
+        try:
+            return send_from_directory(DOCSTER_DIR_PATH.name, 'index.html')
+        except Exception as e:
+            print(f"[!] Failed to serve index.html from disk: {e}. Falling back to in-memory template.", file=sys.stderr)
+            try:
+                return render_template_string(INDEX_HTML)
+            except Exception as render_err:
+                print(f"[!] Error rendering fallback template: {render_err}", file=sys.stderr)
+                return "<h3>Docster encountered a fatal UI error.</h3><p>Please check the console for details.</p>", 500
+
+    @app.route('/rerun', methods=['POST'])
+    def rerun_endpoint():
+        """Triggers a new crawl. Pass ?profile=1 to capture a cProfile run."""
+        try:
+            with crawl_lock: # Publish the delta against the base it was computed from
+                success, profile_name = maybe_profiled("rerun", request.args.get('profile') == '1', perform_crawl)
+                if success and shared_index_enabled:
+                    publish_snapshot()
+            if success:
+                store = crawled_data_store
+                response = {"message": f"Crawl complete. {len(store['files'])} files processed. Updated: {store['timestamp']}",
+                            "generation": store["generation"], "epoch": store["epoch"]}
+                if profile_name:
+                    response["profile"] = profile_name
+                return jsonify(response), 200
+            else:
+                 return jsonify({"error": "Crawl process failed."}), 500
+        except Exception as e:
+            print(f"[!] Error during /rerun: {e}", file=sys.stderr)
+            return jsonify({"error": f"An internal error occurred during crawl: {e}"}), 500
+
+
+    @app.route('/get_all', methods=['GET'])
+    def get_all_endpoint():
+        """Returns all crawled content, plus the generation and epoch to pass to /changes."""
+        store = crawled_data_store # One consistent snapshot for the whole response
+        formatted_content = format_all_content(store)
+        return jsonify({
+            "content": formatted_content,
+            "file_count": len(store.get("files", [])),
+            "generation": store.get("generation", 0),
+            "epoch": store.get("epoch"),
+            "timestamp": store.get("timestamp", "N/A")
+        })
+
+    @app.route('/search', methods=['GET'])
+    def search_endpoint():
+        """
+        Searches the crawled content for a keyword.
+
+        ?mode=exact (default), regex or fuzzy; ?limit= caps the number of results; ?profile=1
+        captures a cProfile run.
+        """
+        keyword = request.args.get('keyword', '')
+        if not keyword:
+            return jsonify({"error": "Missing search keyword"}), 400
+        mode = request.args.get('mode', 'exact')
+        limit = request.args.get('limit')
+        try:
+            limit = int(limit) if limit not in (None, "") else None
+        except ValueError:
+            return jsonify({"error": f"Invalid limit '{limit}'"}), 400
+        if limit is not None and limit <= 0:
+            return jsonify({"error": "Limit must be positive"}), 400
+
+        try:
+            (search_results, match_count, timed_out), profile_name = maybe_profiled(
+                f"search-{mode}-{keyword}", request.args.get('profile') == '1', run_search, keyword, mode, limit
+            )
+            response = {
+                "content": search_results,
+                "match_count": match_count,
+                "mode": mode,
+                "timestamp": crawled_data_store.get("timestamp", "N/A")
+            }
+            if timed_out:
+                response["timed_out"] = True
+            if profile_name:
+                response["profile"] = profile_name
+            return jsonify(response)
+        except SearchInputError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            print(f"[!] Error during /search for '{keyword}': {e}", file=sys.stderr)
+            return jsonify({"error": f"An internal error occurred during search: {e}"}), 500
+
+
+    @app.route('/context', methods=['GET'])
+    def context_endpoint():
+        """Returns a file plus everything it transitively imports (?path=&depth=)."""
+        path = request.args.get('path', '').strip()
+        if not path:
+            return jsonify({"error": "Missing path"}), 400
+        path = posixpath.normpath(path.replace("\\", "/"))
+        depth = request.args.get('depth')
+        try:
+            max_depth = int(depth) if depth not in (None, "") else None
+        except ValueError:
+            return jsonify({"error": f"Invalid depth '{depth}'"}), 400
+
+        files_by_path = {file_info["path"]: file_info for file_info in crawled_data_store.get("files", [])}
+        if path not in files_by_path:
+            return jsonify({"error": f"Path '{path}' was not crawled"}), 404
+
+        closure = collect_import_closure(path, crawled_data_store.get("imports", {}), max_depth)
         return jsonify({
-            "content": search_results,
-            "match_count": match_count,
+            "content": format_all_content({"files": [files_by_path[p] for p, _ in closure]}),
+            "files": [{"path": p, "depth": d} for p, d in closure],
+            "file_count": len(closure),
             "timestamp": crawled_data_store.get("timestamp", "N/A")
-            })
-    except Exception as e:
-        print(f"[!] Error during /search for '{keyword}': {e}", file=sys.stderr)
-        return jsonify({"error": f"An internal error occurred during search: {e}"}), 500
+        })
 
 
-@app.route('/get_config', methods=['GET'])
-def get_config_endpoint():
-    """Returns the current configuration being used."""
-    global config_store
-    # Return a copy to avoid potential modification issues if complex objects were used
-    return jsonify(config_store.copy())
+    @app.route('/pack', methods=['GET'])
+    def pack_endpoint():
+        """Returns the highest-priority files that fit a token budget (?budget=&priority=recent|search|deps&keyword=&path=)."""
+        try:
+            budget = int(request.args.get('budget', ''))
+        except ValueError:
+            return jsonify({"error": "Missing or invalid budget"}), 400
+        if budget <= 0:
+            return jsonify({"error": "Budget must be positive"}), 400
+        path = request.args.get('path', '').strip()
+        try:
+            packed, used, skipped = pack_content(
+                budget,
+                request.args.get('priority', 'recent'),
+                keyword=request.args.get('keyword'),
+                path=posixpath.normpath(path.replace("\\", "/")) if path else None,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            "content": format_all_content({"files": packed}),
+            "files": [{"path": f["path"], "tokens": f.get("tokens")} for f in packed],
+            "file_count": len(packed),
+            "used_tokens": used,
+            "budget": budget,
+            "skipped_count": skipped,
+            "timestamp": crawled_data_store.get("timestamp", "N/A")
+        })
+
+
+    @app.route('/changes', methods=['GET'])
+    def changes_endpoint():
+        """
+        Returns files added, changed or removed since a generation.
+
+        ?since=<generation>&epoch=<epoch> from a previous /get_all or /changes response;
+        ?content=0 omits file bodies. A missing or stale epoch gets resync=true.
+        """
+        try:
+            since = int(request.args.get('since', ''))
+        except ValueError:
+            return jsonify({"error": "Missing or invalid since generation"}), 400
+        store = crawled_data_store # One consistent snapshot for the whole response
+        delta = collect_changes_since(since, request.args.get('epoch'), store)
+        if delta is None:
+            return jsonify({"resync": True, "generation": store.get("generation", 0), "epoch": store.get("epoch"),
+                            "timestamp": store.get("timestamp", "N/A")})
+
+        include_content = request.args.get('content', '1') != '0'
+        files_by_path = {f["path"]: f for f in store.get("files", [])}
+        def describe(path, file_hash):
+            entry = {"path": path, "hash": file_hash}
+            if include_content and path in files_by_path:
+                entry["type"] = files_by_path[path]["type"]
+                entry["content"] = files_by_path[path]["content"]
+            return entry
+
+        return jsonify({
+            "resync": False,
+            "generation": store.get("generation", 0),
+            "epoch": store.get("epoch"),
+            "added": [describe(p, h) for p, h in delta["added"].items()],
+            "changed": [describe(p, h) for p, h in delta["changed"].items()],
+            "removed": delta["removed"],
+            "timestamp": store.get("timestamp", "N/A")
+        })
+
+
+    @app.route('/get_config', methods=['GET'])
+    def get_config_endpoint():
+        """Returns the current configuration being used."""
+        # Return a copy to avoid potential modification issues if complex objects were used
+        return jsonify(config_store.copy())
+
+
+    @app.route('/profiles', methods=['GET'])
+    def profiles_endpoint():
+        """Lists captured profiles."""
+        return jsonify({"profiles": list_profiles(), "directory": str(PROFILES_DIR_PATH)})
+
+    @app.route('/profiles/<name>', methods=['GET'])
+    def profile_detail_endpoint(name):
+        """Returns a text report for one captured profile (?sort=cumulative|tottime|calls)."""
+        sort_key = request.args.get('sort', 'cumulative')
+        if sort_key not in ("cumulative", "tottime", "calls", "ncalls", "time"):
+            return jsonify({"error": f"Unsupported sort key '{sort_key}'"}), 400
+        report = render_profile(name, sort_key)
+        if report is None:
+            return jsonify({"error": f"Profile '{name}' not found"}), 404
+        return jsonify({"name": name, "report": report})
+
+    return app
 
 
 # --- Main Execution ---
-def open_browser():
+def open_browser(host="127.0.0.1", port=DEFAULT_PORT):
     """Opens the web browser to the Flask app."""
+    import webbrowser
     try:
-        webbrowser.open(f"http://127.0.0.1:{DEFAULT_PORT}/")
-        print(f"[*] Attempted to open web browser to http://127.0.0.1:{DEFAULT_PORT}/")
+        webbrowser.open(f"http://{host}:{port}/")
+        print(f"[*] Attempted to open web browser to http://{host}:{port}/")
     except Exception as e:
         print(f"[!] Could not open web browser automatically: {e}", file=sys.stderr)
-        print(f"[*] Please open your browser and navigate to http://127.0.0.1:{DEFAULT_PORT}/ manually.")
+        print(f"[*] Please open your browser and navigate to http://{host}:{port}/ manually.")
 
-if __name__ == "__main__":
+def run_workers(app, args):
+    """
+    Serves the app with several gunicorn worker processes.
+
+    The initial crawl is published to the shared SQLite index before forking, so
+    workers start from the same snapshot and never crawl on their own unless /rerun
+    is called, in which case the new snapshot is published for all of them.
+    """
+    global shared_index_enabled
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as e:
+        print(f"[!] gunicorn is required for --workers ({e}). Install it with `pip install gunicorn`.", file=sys.stderr)
+        sys.exit(1)
+
+    shared_index_enabled = True
+    try:
+        publish_snapshot()
+    except sqlite3.Error as e:
+        print(f"[!] Error publishing crawl to {INDEX_DB_PATH}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    class DocsterApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{args.host}:{args.port}")
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", 4)
+            self.cfg.set("post_fork", lambda server, worker: start_index_watcher())
+
+        def load(self):
+            return app
+
+    print(f"[*] Starting {args.workers} gunicorn workers on http://{args.host}:{args.port}/")
+    print("[*] Press CTRL+C to stop the server.")
+    DocsterApplication().run()
+
+def parse_args(argv=None):
+    """Parses command line arguments. With no subcommand, Docster starts the web server."""
+    parser = argparse.ArgumentParser(description="Docster: crawl a project and serve its contents for LLM context.")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Profile every crawl and search with cProfile; stats are written to {DOCSTER_DIR_NAME}/profiles/")
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser("serve", help="Crawl, start the web UI and open a browser (default)")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to bind (default: {DEFAULT_PORT})")
+    serve_parser.add_argument("--workers", type=int, default=1,
+                              help="Serve with N gunicorn worker processes sharing one crawl snapshot (requires gunicorn)")
+    subparsers.add_parser("dump", help="Crawl and print all formatted content to stdout")
+    search_parser = subparsers.add_parser("search", help="Crawl and print code blocks matching a keyword to stdout")
+    search_parser.add_argument("keyword", help="Keyword, function or variable name to search for")
+    search_parser.add_argument("--mode", choices=SEARCH_MODES, default="exact", help="Search mode (default: exact)")
+    search_parser.add_argument("--limit", type=int, default=None, help="Maximum number of results")
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(list(argv if argv is not None else sys.argv[1:]) + ["serve"])
+    return args
+
+def run_headless(args):
+    """
+    Runs a one-shot `dump` or `search` and streams the result to stdout.
+
+    Nothing is written to the docster/ directory (apart from --profile captures) and
+    Flask is never imported. Progress messages go to stderr so stdout stays pipeable.
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        load_config()
+        maybe_profiled("initial-crawl", False, perform_crawl)
+        if args.command == "dump":
+            output = format_all_content(crawled_data_store)
+        else:
+            try:
+                (output, match_count, timed_out), _ = maybe_profiled(
+                    f"search-{args.mode}-{args.keyword}", False, run_search, args.keyword, args.mode, args.limit
+                )
+            except SearchInputError as e:
+                print(f"[!] {e}", file=sys.stderr)
+                sys.exit(2)
+            if timed_out:
+                print("[!] Regex search timed out; results are partial.", file=sys.stderr)
+            print(f"[*] {match_count} matches found for '{args.keyword}'.")
+    sys.stdout.write(output)
+    sys.stdout.flush()
+
+def run_server(args):
+    """Sets up the docster directory, crawls and starts the Flask web server."""
     print("--- Starting Docster ---")
+    if profiling_enabled:
+        print(f"[*] Profiling enabled. Captures are written to {PROFILES_DIR_PATH}")
 
     # 1. Ensure directories and config are set up
     ensure_docster_dir_and_config()
@@ -779,29 +2031,39 @@ if __name__ == "__main__":
 
     # 3. Perform initial crawl
     try:
-        perform_crawl()
+        maybe_profiled("initial-crawl", False, perform_crawl)
     except Exception as e:
         print(f"[!] Critical error during initial crawl: {e}", file=sys.stderr)
         # Decide if app should exit or continue with empty/partial data
         # For now, continue, UI will show errors or no data.
 
     # 4. Start Flask app in a separate thread or use development server's auto-reloader (but we need browser open)
-    print(f"[*] Starting Flask web server on http://127.0.0.1:{DEFAULT_PORT}/")
+    try:
+        app = create_app()
+    except ImportError as e:
+        print(f"[!] Flask is required to run the web server ({e}). Install it with `pip install flask`.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.workers > 1:
+        run_workers(app, args)
+        return
+
+    print(f"[*] Starting Flask web server on http://{args.host}:{args.port}/")
     print("[*] Press CTRL+C to stop the server.")
 
     # Use a timer to open the browser shortly after the server *should* be up.
     # This is more reliable than opening it immediately.
-    threading.Timer(1.5, open_browser).start()
+    threading.Timer(1.5, open_browser, args=(args.host, args.port)).start()
 
     # Run Flask server
     try:
         # Setting debug=False for production-like behavior (single process unless threaded=True)
         # Use threaded=True to handle multiple requests concurrently if needed,
         # though for this simple UI it might not be essential.
-        app.run(host="127.0.0.1", port=DEFAULT_PORT, debug=False, threaded=True)
+        app.run(host=args.host, port=args.port, debug=False, threaded=True)
     except OSError as e:
         if "address already in use" in str(e).lower():
-            print(f"[!] Error: Port {DEFAULT_PORT} is already in use. Please stop the existing process or choose a different port.", file=sys.stderr)
+            print(f"[!] Error: Port {args.port} is already in use. Please stop the existing process or choose a different port.", file=sys.stderr)
         else:
             print(f"[!] Error starting Flask server: {e}", file=sys.stderr)
         sys.exit(1)
@@ -809,4 +2071,12 @@ if __name__ == "__main__":
         print(f"[!] An unexpected error occurred: {e}", file=sys.stderr)
         sys.exit(1)
 
-    print("--- Docster finished ---")
\ No newline at end of file
+    print("--- Docster finished ---")
+
+if __name__ == "__main__":
+    args = parse_args()
+    profiling_enabled = args.profile
+    if args.command == "serve":
+        run_server(args)
+    else:
+        run_headless(args)